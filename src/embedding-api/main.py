@@ -3,12 +3,14 @@ FastAPI application for document embedding.
 Provides an endpoint to download chunk files, generate embeddings, and write embedded chunks.
 """
 
+import base64
 import json
 import logging
 import sys
 import traceback
 from typing import List
 
+import numpy as np
 from dotenv import load_dotenv
 from azure.identity import DefaultAzureCredential
 from azure.storage.blob import BlobServiceClient, ContentSettings
@@ -180,8 +182,8 @@ async def embed_document(request: EmbedDocumentRequest):
     1. Takes document metadata (document_id, etc.)
     2. Downloads all chunk.json files from Azure Blob Storage (source container)
     3. Generates embeddings for each chunk's content using Azure OpenAI
-    4. Writes each chunk as JSON to the embedding container with an added `embedding` field
-       - Blob name format: `{document_id}/chunk-{chunkIndex}.json`
+    4. Writes all chunks as one JSON Lines blob to the embedding container, each line with an added `embedding` field
+       - Blob name format: `{document_id}/chunks.jsonl`
     
     Args:
         request: EmbedDocumentRequest containing document metadata
@@ -223,36 +225,38 @@ async def embed_document(request: EmbedDocumentRequest):
         except Exception as e:
             logger.debug(f"Container already exists or creation failed: {e}")
         
-        uploaded = []
-        for idx, (c, emb) in enumerate(zip(chunks, embeddings)):
-            try:
-                # Build json payload including embedding
-                payload = {
-                    "chunk_id": c.chunk_id,
-                    "chunk_index": c.chunk_index,
-                    "page_number": c.page_number,
-                    "content": c.content,
-                    "metadata": c.metadata.model_dump() if hasattr(c.metadata, "model_dump") else dict(c.metadata),
-                    "embedding": emb,
-                }
-                blob_name = f"{request.document_id}/chunks/chunk-{c.chunk_index}.json"
-                blob_client = blob_service_client.get_blob_client(
-                    container=blob_config.embedding_container,
-                    blob=blob_name
-                )
-                blob_client.upload_blob(
-                    json.dumps(payload, ensure_ascii=False),
-                    overwrite=True,
-                    content_settings=ContentSettings(content_type="application/json")
-                )
-                uploaded.append(blob_name)
-                logger.debug(f"Uploaded chunk {idx + 1}/{len(chunks)}: {blob_name}")
-            except Exception as chunk_error:
-                logger.error(f"Error uploading chunk {idx}: {str(chunk_error)}")
-                logger.error(f"Traceback: {traceback.format_exc()}")
-                raise
+        # Build one json line per chunk, including the embedding as base64-encoded float16 bytes
+        lines = []
+        for c, emb in zip(chunks, embeddings):
+            payload = {
+                "chunk_id": c.chunk_id,
+                "chunk_index": c.chunk_index,
+                "page_number": c.page_number,
+                "content": c.content,
+                "metadata": c.metadata.model_dump() if hasattr(c.metadata, "model_dump") else dict(c.metadata),
+                "embedding": base64.b64encode(np.asarray(emb, dtype=np.float16).tobytes()).decode("ascii"),
+            }
+            lines.append(json.dumps(payload, ensure_ascii=False))
+        
+        # Write every chunk of the document as a single blob so readers fetch it in one request
+        blob_name = f"{request.document_id}/chunks.jsonl"
+        try:
+            blob_client = blob_service_client.get_blob_client(
+                container=blob_config.embedding_container,
+                blob=blob_name
+            )
+            blob_client.upload_blob(
+                "\n".join(lines).encode("utf-8"),
+                overwrite=True,
+                content_settings=ContentSettings(content_type="application/x-ndjson")
+            )
+            logger.debug(f"Uploaded {len(lines)} chunks to {blob_name}")
+        except Exception as upload_error:
+            logger.error(f"Error uploading {blob_name}: {str(upload_error)}")
+            logger.error(f"Traceback: {traceback.format_exc()}")
+            raise
         
-        logger.info(f"Successfully uploaded {len(uploaded)} embedded chunks")
+        logger.info(f"Successfully uploaded {len(lines)} embedded chunks")
         
         return EmbedDocumentResponse(
             document_id=request.document_id,
@@ -3,19 +3,208 @@ Knowledge graph builder classes for creating Neo4j graph structures.
 Adapted from knowledge_graph.py and response_knowledge_graph.py.
 """
 
-from neo4j import GraphDatabase
-from typing import List, Dict, Any
+from neo4j import AsyncDriver, AsyncGraphDatabase
+from typing import List, Dict, Any, Tuple
+import asyncio
+import functools
 import logging
 
+import numpy as np
+
 from models import EmbeddedChunkData
 
 logger = logging.getLogger(__name__)
 
+# Cypher statements are module-level constants so every call sends the identical
+# query text, keeping driver and server query plan caches warm across documents
+_Q_MERGE_LOCATION = """
+MERGE (l:Location {name: $location_name})
+"""
+
+_Q_MERGE_YEAR = """
+MERGE (y:Year {year: $year})
+"""
+
+_Q_MERGE_RFP = """
+MERGE (r:Rfp {name: $rfp_year})
+"""
+
+_Q_LINK_RFP_YEAR_LOCATION = """
+MATCH (l:Location {name: $location_name})
+MATCH (r:Rfp {name: $rfp_year})
+MATCH (y:Year {year: $year})
+MERGE (l)-[:HAS_RFP]->(r)
+MERGE (r)-[:IS_YEAR]->(y)
+MERGE (r)-[:HAS_LOCATION]->(l)
+"""
+
+_Q_MERGE_DOCUMENT = """
+MERGE (d:Document {name: $doc_name, source: $doc_source, doc_type: $doc_type})
+"""
+
+_Q_LINK_RFP_DOCUMENT = """
+MATCH (r:Rfp {name: $rfp_name})
+MATCH (d:Document {name: $doc_name})
+MERGE (r)-[:HAS_DOCUMENT]->(d)
+MERGE (d)-[:HAS_RFP]->(r)
+"""
+
+_Q_MERGE_PAGE = """
+MERGE (p:Page {doc_name: $doc_name, page_number: $page_number})
+SET p.content = $content
+"""
+
+_Q_LINK_PAGE_DOCUMENT = """
+MATCH (d:Document {name: $doc_name})
+MATCH (p:Page {doc_name: $doc_name, page_number: $page_number})
+MERGE (d)-[:HAS_PAGE]->(p)
+MERGE (p)-[:HAS_DOCUMENT]->(d)
+"""
+
+# Chunk columns are sent as parallel lists alongside the embedding matrix
+# and indexed by row, so the whole document is written in one round trip
+_CHUNK_ROWS = """
+UNWIND range(0, size($chunk_ids) - 1) AS i
+"""
+
+_MERGE_REQUEST_CHUNK = """
+MERGE (c:RequestChunk {chunk_id: $chunk_ids[i]})
+SET c.text = $texts[i],
+    c.embedding = $embeddings[i],
+    c.doc_name = $doc_name,
+    c.page_number = $page_numbers[i],
+    c.chunk_index = $chunk_indexes[i]
+WITH c, i
+MATCH (p:Page {doc_name: $doc_name, page_number: $page_numbers[i]})
+MERGE (p)-[:HAS_CHUNK]->(c)
+MERGE (c)-[:HAS_PAGE]->(p)
+"""
+
+_MERGE_RESPONSE_CHUNK = """
+MERGE (c:ResponseChunk {chunk_id: $chunk_ids[i]})
+SET c.index = $chunk_indexes[i],
+    c.text = $texts[i],
+    c.embedding = $embeddings[i],
+    c.doc_name = $doc_name,
+    c.page_number = $page_numbers[i]
+WITH c, i
+MATCH (p:Page {doc_name: $doc_name, page_number: $page_numbers[i]})
+MERGE (p)-[:HAS_CHUNK]->(c)
+MERGE (c)-[:HAS_PAGE]->(p)
+"""
+
+_Q_MERGE_REQUEST_CHUNKS = _CHUNK_ROWS + _MERGE_REQUEST_CHUNK
+
+_Q_MERGE_RESPONSE_CHUNKS = _CHUNK_ROWS + _MERGE_RESPONSE_CHUNK
+
+# With APOC available, the same row statements are run through
+# apoc.periodic.iterate so each batch commits in its own transaction and
+# transaction memory stays bounded for very large documents
+_Q_APOC_CHUNK_ROWS = _CHUNK_ROWS + "RETURN i"
+
+_Q_APOC_ITERATE = """
+CALL apoc.periodic.iterate($iterate_query, $action_query,
+    {batchSize: $batch_size, parallel: false, params: $params})
+YIELD failedBatches, errorMessages
+RETURN failedBatches, errorMessages
+"""
+
+_Q_APOC_PERIODIC_AVAILABLE = """
+SHOW PROCEDURES YIELD name
+WHERE name = 'apoc.periodic.iterate'
+RETURN count(name) > 0 AS available
+"""
+
+APOC_BATCH_SIZE = 500
+
+
+# Drivers handed out by get_driver, closed together at application shutdown
+_drivers: List[AsyncDriver] = []
+
+# apoc.periodic.iterate availability per (uri, database), checked once per process
+_apoc_available: Dict[Tuple[str, str], bool] = {}
+
+
+@functools.lru_cache(maxsize=8)
+def get_driver(uri: str, username: str, password: str, database: str) -> AsyncDriver:
+    """
+    Get the shared Neo4j driver for a connection, creating it on first use
+    
+    The driver owns a connection pool and is safe to share, so one instance is
+    reused by every graph builder for the same connection parameters.
+    
+    Args:
+        uri: Neo4j URI
+        username: Neo4j username
+        password: Neo4j password
+        database: Neo4j database name
+        
+    Returns:
+        The cached async driver
+    """
+    logger.info("Creating Neo4j driver for %s (database: %s)", uri, database)
+    driver = AsyncGraphDatabase.driver(
+        uri,
+        auth=(username, password),
+        max_connection_pool_size=64,
+        connection_acquisition_timeout=30
+    )
+    _drivers.append(driver)
+    return driver
+
+
+async def close_drivers():
+    """Close every cached Neo4j driver"""
+    get_driver.cache_clear()
+    while _drivers:
+        await _drivers.pop().close()
+    _apoc_available.clear()
+
+
+def stack_embeddings(chunks: List[EmbeddedChunkData]) -> np.ndarray:
+    """
+    Stack chunk embeddings into a single contiguous float32 matrix
+    
+    Args:
+        chunks: List of embedded chunk data
+        
+    Returns:
+        Array of shape (len(chunks), embedding_dim), row i belonging to chunks[i]
+    """
+    return np.stack([chunk.embedding for chunk in chunks])
+
+
+def build_chunk_parameters(doc_name: str, chunks: List[EmbeddedChunkData]) -> Dict[str, Any]:
+    """
+    Build the complete chunk write payload for a document in a single pass
+    
+    Args:
+        doc_name: Name of the document the chunks belong to
+        chunks: List of embedded chunk data
+        
+    Returns:
+        Query parameters with parallel chunk columns and the embedding matrix
+    """
+    chunk_ids, texts, page_numbers, chunk_indexes = (
+        list(column) for column in zip(*[
+            (chunk.chunk_id, chunk.content, chunk.page_number, chunk.chunk_index)
+            for chunk in chunks
+        ])
+    )
+    return {
+        "doc_name": doc_name,
+        "chunk_ids": chunk_ids,
+        "texts": texts,
+        "page_numbers": page_numbers,
+        "chunk_indexes": chunk_indexes,
+        "embeddings": stack_embeddings(chunks)
+    }
+
 
 class GraphBuilder:
     """Base class for building and managing knowledge graph in Neo4j"""
     
-    def __init__(self, uri: str, username: str, password: str, database: str):
+    def __init__(self, uri: str, username: str, password: str, database: str, use_apoc: bool = True):
         """
         Initialize the GraphBuilder with Neo4j connection parameters
         
@@ -24,19 +213,20 @@ class GraphBuilder:
             username: Neo4j username
             password: Neo4j password
             database: Neo4j database name
+            use_apoc: Write chunks through apoc.periodic.iterate when APOC is installed
         """
         self.uri = uri
         self.username = username
         self.password = password
         self.database = database
-        self.driver = GraphDatabase.driver(uri, auth=(username, password))
+        self.use_apoc = use_apoc
+        self.driver = get_driver(uri, username, password, database)
     
-    def close(self):
-        """Close the Neo4j driver connection"""
-        if self.driver:
-            self.driver.close()
+    async def close(self):
+        """Release the builder; the shared driver stays open until close_drivers()"""
+        self.driver = None
     
-    def execute_query(self, cypher_query: str, parameters: dict = None):
+    async def execute_query(self, cypher_query: str, parameters: dict = None):
         """
         Execute a Cypher query on the Neo4j database
         
@@ -45,92 +235,118 @@ class GraphBuilder:
             parameters: Optional dictionary of query parameters
         """
         try:
-            with self.driver.session(database=self.database) as session:
-                session.run(cypher_query, parameters)
+            async with self.driver.session(database=self.database) as session:
+                await session.run(cypher_query, parameters)
+        except Exception as e:
+            logger.error("Error executing query: %s", e)
+            raise
+    
+    async def apoc_periodic_available(self) -> bool:
+        """
+        Check once per connection whether apoc.periodic.iterate is installed on the server
+        
+        Only a definite answer from the server is cached; if the probe fails, plain UNWIND is
+        used for this call and the check is retried next time.
+        """
+        key = (self.uri, self.database)
+        if key not in _apoc_available:
+            try:
+                async with self.driver.session(database=self.database) as session:
+                    result = await session.run(_Q_APOC_PERIODIC_AVAILABLE)
+                    record = await result.single()
+            except Exception as e:
+                logger.warning("Could not check for APOC procedures, using plain UNWIND: %s", e)
+                return False
+            _apoc_available[key] = bool(record and record["available"])
+            logger.info("apoc.periodic.iterate available: %s", _apoc_available[key])
+        return _apoc_available[key]
+    
+    async def write_chunks(self, unwind_query: str, chunk_action: str, chunk_parameters: dict):
+        """
+        Write a batch of chunk rows, using apoc.periodic.iterate when enabled and available
+        
+        Args:
+            unwind_query: Single-transaction UNWIND statement used without APOC
+            chunk_action: Cypher applied to each chunk row index `i` under APOC
+            chunk_parameters: Parallel chunk columns and shared parameters
+        """
+        if not (self.use_apoc and await self.apoc_periodic_available()):
+            await self.execute_query(unwind_query, chunk_parameters)
+            return
+        
+        apoc_parameters = {
+            "iterate_query": _Q_APOC_CHUNK_ROWS,
+            "action_query": chunk_action,
+            "batch_size": APOC_BATCH_SIZE,
+            "params": chunk_parameters
+        }
+        try:
+            async with self.driver.session(database=self.database) as session:
+                result = await session.run(_Q_APOC_ITERATE, apoc_parameters)
+                record = await result.single()
         except Exception as e:
-            logger.error(f"Error executing query: {e}")
+            logger.error("Error executing query: %s", e)
             raise
+        
+        if record and record["failedBatches"]:
+            raise RuntimeError(
+                f"apoc.periodic.iterate failed {record['failedBatches']} batches: {record['errorMessages']}"
+            )
 
 
 class RequestGraphBuilder(GraphBuilder):
     """Class for building request document knowledge graphs"""
     
-    def create_location_node(self, location_name: str):
+    async def create_location_node(self, location_name: str):
         """Create a Location node in Neo4j"""
-        logger.info(f"Creating location {location_name}")
-        create_location_query = """
-        MERGE (l:Location {name: $location_name})
-        """
+        logger.info("Creating location %s", location_name)
         parameters = {"location_name": location_name}
-        self.execute_query(create_location_query, parameters)
+        await self.execute_query(_Q_MERGE_LOCATION, parameters)
     
-    def create_year_node(self, year: int):
+    async def create_year_node(self, year: int):
         """Create a Year node in Neo4j"""
-        logger.info(f"Creating year {year}")
-        create_year_query = """
-        MERGE (y:Year {year: $year})
-        """
+        logger.info("Creating year %s", year)
         parameters = {"year": str(year)}
-        self.execute_query(create_year_query, parameters)
+        await self.execute_query(_Q_MERGE_YEAR, parameters)
     
-    def create_rfp_year_node(self, rfp_year: str):
+    async def create_rfp_year_node(self, rfp_year: str):
         """Create an RFP Year node in Neo4j"""
-        logger.info(f"Creating RFP Year: {rfp_year}")
-        create_rfp_year_query = """
-        MERGE (r:Rfp {name: $rfp_year})
-        """
+        logger.info("Creating RFP Year: %s", rfp_year)
         parameters = {"rfp_year": rfp_year}
-        self.execute_query(create_rfp_year_query, parameters)
+        await self.execute_query(_Q_MERGE_RFP, parameters)
     
-    def create_rfp_year_location_relationships(self, location_name: str, year: int, rfp_year: str):
+    async def create_rfp_year_location_relationships(self, location_name: str, year: int, rfp_year: str):
         """Create relationships between Location, RFP, and Year nodes"""
-        logger.info(f"Creating rfp year location association {location_name} to {year} to {rfp_year}")
-        create_association_query = """
-        MATCH (l:Location {name: $location_name})
-        MATCH (r:Rfp {name: $rfp_year})
-        MATCH (y:Year {year: $year})
-        MERGE (l)-[:HAS_RFP]->(r)
-        MERGE (r)-[:IS_YEAR]->(y)
-        MERGE (r)-[:HAS_LOCATION]->(l)
-        """
+        logger.info("Creating rfp year location association %s to %s to %s", location_name, year, rfp_year)
         parameters = {
             "location_name": location_name,
             "rfp_year": rfp_year,
             "year": str(year),
         }
-        self.execute_query(create_association_query, parameters)
+        await self.execute_query(_Q_LINK_RFP_YEAR_LOCATION, parameters)
     
-    def create_document_node(self, doc_name: str, source: str, doc_type: str, rfp_year: str):
+    async def create_document_node(self, doc_name: str, source: str, doc_type: str, rfp_year: str):
         """Create a Document node and link it to an RFP"""
-        logger.info(f"Creating document: {doc_name}")
-        doc_create_query = """
-        MERGE (w:Document {name: $doc_name, source: $doc_source, doc_type: $doc_type})
-        """
+        logger.info("Creating document: %s", doc_name)
         doc_parameters = {
             "doc_name": doc_name,
             "doc_source": source,
             "doc_type": doc_type
         }
-        self.execute_query(doc_create_query, doc_parameters)
+        await self.execute_query(_Q_MERGE_DOCUMENT, doc_parameters)
         
         # Create relationship between RFP and Document
-        relationship_query = """
-        MATCH (r:Rfp {name: $rfp_year})
-        MATCH (d:Document {name: $doc_name})
-        MERGE (r)-[:HAS_DOCUMENT]->(d)
-        MERGE (d)-[:HAS_RFP]->(r)
-        """
         relationship_parameters = {
-            "rfp_year": rfp_year,
+            "rfp_name": rfp_year,
             "doc_name": doc_name
         }
-        self.execute_query(relationship_query, relationship_parameters)
+        await self.execute_query(_Q_LINK_RFP_DOCUMENT, relationship_parameters)
     
-    def create_page_nodes(self, doc_name: str, chunks: List[EmbeddedChunkData]):
+    async def create_page_nodes(self, doc_name: str, chunks: List[EmbeddedChunkData]):
         """Create Page nodes based on chunks"""
         # Get unique pages from chunks
         pages_set = set(chunk.page_number for chunk in chunks)
-        logger.info(f"Creating {len(pages_set)} page nodes for document: {doc_name}")
+        logger.info("Creating %d page nodes for document: %s", len(pages_set), doc_name)
         
         for page_number in pages_set:
             # Get content for this page (combine all chunks for this page)
@@ -138,69 +354,29 @@ class RequestGraphBuilder(GraphBuilder):
             content = " ".join(chunk.content for chunk in page_chunks)
             
             # Create Page node
-            create_page_query = """
-            MERGE (p:Page {doc_name: $doc_name, page_number: $page_number})
-            SET p.content = $content
-            """
             page_parameters = {
                 "doc_name": doc_name,
                 "page_number": page_number,
                 "content": content[:5000]  # Limit content size
             }
-            self.execute_query(create_page_query, page_parameters)
+            await self.execute_query(_Q_MERGE_PAGE, page_parameters)
             
             # Link Page to Document
-            link_page_query = """
-            MATCH (d:Document {name: $doc_name})
-            MATCH (p:Page {doc_name: $doc_name, page_number: $page_number})
-            MERGE (d)-[:HAS_PAGE]->(p)
-            MERGE (p)-[:HAS_DOCUMENT]->(d)
-            """
             link_parameters = {
                 "doc_name": doc_name,
                 "page_number": page_number
             }
-            self.execute_query(link_page_query, link_parameters)
+            await self.execute_query(_Q_LINK_PAGE_DOCUMENT, link_parameters)
     
-    def create_chunk_nodes(self, doc_name: str, chunks: List[EmbeddedChunkData]):
-        """Create RequestChunk nodes for each embedded chunk"""
-        logger.info(f"Creating {len(chunks)} chunk nodes for document: {doc_name}")
-        
-        for chunk in chunks:
-            # Create RequestChunk node
-            create_chunk_query = """
-            MERGE (c:RequestChunk {chunk_id: $chunk_id})
-            SET c.text = $text,
-                c.embedding = $embedding,
-                c.doc_name = $doc_name,
-                c.page_number = $page_number,
-                c.chunk_index = $chunk_index
-            """
-            chunk_parameters = {
-                "chunk_id": chunk.chunk_id,
-                "text": chunk.content,
-                "embedding": chunk.embedding,
-                "doc_name": doc_name,
-                "page_number": chunk.page_number,
-                "chunk_index": chunk.chunk_index
-            }
-            self.execute_query(create_chunk_query, chunk_parameters)
-            
-            # Link Chunk to Page
-            link_chunk_to_page_query = """
-            MATCH (p:Page {doc_name: $doc_name, page_number: $page_number})
-            MATCH (c:RequestChunk {chunk_id: $chunk_id})
-            MERGE (p)-[:HAS_CHUNK]->(c)
-            MERGE (c)-[:HAS_PAGE]->(p)
-            """
-            link_page_parameters = {
-                "doc_name": doc_name,
-                "page_number": chunk.page_number,
-                "chunk_id": chunk.chunk_id
-            }
-            self.execute_query(link_chunk_to_page_query, link_page_parameters)
+    async def create_chunk_nodes(self, chunk_parameters: Dict[str, Any]):
+        """Create RequestChunk nodes for all embedded chunks and link them to pages in one query"""
+        logger.info(
+            "Creating %d chunk nodes for document: %s",
+            len(chunk_parameters["chunk_ids"]), chunk_parameters["doc_name"]
+        )
+        await self.write_chunks(_Q_MERGE_REQUEST_CHUNKS, _MERGE_REQUEST_CHUNK, chunk_parameters)
     
-    def build_graph(self, document_id: str, chunks: List[EmbeddedChunkData]) -> int:
+    async def build_graph(self, document_id: str, chunks: List[EmbeddedChunkData]) -> int:
         """
         Build the knowledge graph from embedded chunks for a request document
         
@@ -224,84 +400,72 @@ class RequestGraphBuilder(GraphBuilder):
         # Create RFP year identifier
         rfp_year = f"{location} RFP {str(year)[-2:]}" if location and year else f"RFP {document_id}"
         
-        logger.info(f"Building graph for document: {doc_name}")
-        logger.info(f"Location: {location}, Year: {year}, RFP Year: {rfp_year}")
+        logger.info("Building graph for document: %s", doc_name)
+        logger.info("Location: %s, Year: %s, RFP Year: %s", location, year, rfp_year)
         
-        nodes_created = 0
+        # Build the chunk payload before any query is issued
+        chunk_parameters = build_chunk_parameters(doc_name, chunks)
         
-        # Create Location node
+        # Location, Year and RFP Year nodes are independent of each other,
+        # so create them concurrently on separate sessions
+        top_level_creates = [self.create_rfp_year_node(rfp_year)]
         if location:
-            self.create_location_node(location)
-            nodes_created += 1
-        
-        # Create Year node
+            top_level_creates.append(self.create_location_node(location))
         if year:
-            self.create_year_node(year)
-            nodes_created += 1
-        
-        # Create RFP Year node
-        self.create_rfp_year_node(rfp_year)
-        nodes_created += 1
+            top_level_creates.append(self.create_year_node(year))
+        await asyncio.gather(*top_level_creates)
+        nodes_created = len(top_level_creates)
         
         # Create relationships between Location, RFP, and Year
         if location and year:
-            self.create_rfp_year_location_relationships(location, year, rfp_year)
+            await self.create_rfp_year_location_relationships(location, year, rfp_year)
         
         # Create Document node and link to RFP
         source = f"{doc_name}.pdf"
-        self.create_document_node(doc_name, source, doc_type, rfp_year)
+        await self.create_document_node(doc_name, source, doc_type, rfp_year)
         nodes_created += 1
         
         # Create Page nodes
         pages_set = set(chunk.page_number for chunk in chunks)
-        self.create_page_nodes(doc_name, chunks)
+        await self.create_page_nodes(doc_name, chunks)
         nodes_created += len(pages_set)
         
         # Create Chunk nodes
-        self.create_chunk_nodes(doc_name, chunks)
+        await self.create_chunk_nodes(chunk_parameters)
         nodes_created += len(chunks)
         
-        logger.info(f"Graph building complete for {doc_name}. Created {nodes_created} nodes")
+        logger.info("Graph building complete for %s. Created %d nodes", doc_name, nodes_created)
         return nodes_created
 
 
 class ResponseGraphBuilder(GraphBuilder):
     """Class for building response document knowledge graphs"""
     
-    def create_document_node(self, doc_name: str, source: str, doc_type: str, rfp_name: str):
+    async def create_document_node(self, doc_name: str, source: str, doc_type: str, rfp_name: str):
         """Create a Document node and link it to an RFP"""
-        logger.info(f"Creating response document: {doc_name}")
+        logger.info("Creating response document: %s", doc_name)
         
         # Create Document node
-        doc_create_query = """
-        MERGE (d:Document {name: $doc_name, source: $doc_source, doc_type: $doc_type})
-        """
         doc_parameters = {
             "doc_name": doc_name,
             "doc_source": source,
             "doc_type": doc_type
         }
-        self.execute_query(doc_create_query, doc_parameters)
+        await self.execute_query(_Q_MERGE_DOCUMENT, doc_parameters)
         
         # Create relationship between RFP and Document
-        logger.info(f"Linking document to RFP: {rfp_name}")
-        relationship_query = """
-        MATCH (r:Rfp {name: $rfp_name})
-        MATCH (d:Document {name: $doc_name})
-        MERGE (r)-[:HAS_DOCUMENT]->(d)
-        MERGE (d)-[:HAS_RFP]->(r)
-        """
+        logger.info("Linking document to RFP: %s", rfp_name)
         relationship_parameters = {
             "rfp_name": rfp_name,
             "doc_name": doc_name
         }
-        self.execute_query(relationship_query, relationship_parameters)
+        await self.execute_query(_Q_LINK_RFP_DOCUMENT, relationship_parameters)
     
-    def create_page_nodes(self, doc_name: str, chunks: List[EmbeddedChunkData]):
+    async def create_page_nodes(self, doc_name: str, chunks: List[EmbeddedChunkData]):
         """Create Page nodes based on chunks"""
         # Get unique pages from chunks
         pages_set = set(chunk.page_number for chunk in chunks)
-        logger.info(f"Creating {len(pages_set)} Page nodes for document: {doc_name}")
+        logger.info("Creating %d Page nodes for document: %s", len(pages_set), doc_name)
         
         for page_number in pages_set:
             # Get content for this page
@@ -309,73 +473,34 @@ class ResponseGraphBuilder(GraphBuilder):
             content = " ".join(chunk.content for chunk in page_chunks)
             
             # Create Page node
-            create_page_query = """
-            MERGE (p:Page {doc_name: $doc_name, page_number: $page_number})
-            SET p.content = $content
-            """
             page_parameters = {
                 "doc_name": doc_name,
                 "page_number": page_number,
                 "content": content[:5000]  # Limit content size
             }
-            self.execute_query(create_page_query, page_parameters)
+            await self.execute_query(_Q_MERGE_PAGE, page_parameters)
             
             # Link Page to Document
-            link_page_query = """
-            MATCH (d:Document {name: $doc_name})
-            MATCH (p:Page {doc_name: $doc_name, page_number: $page_number})
-            MERGE (d)-[:HAS_PAGE]->(p)
-            MERGE (p)-[:HAS_DOCUMENT]->(d)
-            """
             link_parameters = {
                 "doc_name": doc_name,
                 "page_number": page_number
             }
-            self.execute_query(link_page_query, link_parameters)
+            await self.execute_query(_Q_LINK_PAGE_DOCUMENT, link_parameters)
         
-        logger.info(f"✓ Created {len(pages_set)} Page nodes and linked to document")
+        logger.info("✓ Created %d Page nodes and linked to document", len(pages_set))
     
-    def create_response_chunk_nodes(self, doc_name: str, chunks: List[EmbeddedChunkData]):
-        """Create ResponseChunk nodes for each embedded chunk and link to pages"""
-        logger.info(f"Creating {len(chunks)} ResponseChunk nodes for document: {doc_name}")
-        
-        for chunk in chunks:
-            # Create ResponseChunk node
-            create_chunk_query = """
-            MERGE (c:ResponseChunk {chunk_id: $chunk_id})
-            SET c.index = $chunk_index,
-                c.text = $text,
-                c.embedding = $embedding,
-                c.doc_name = $doc_name,
-                c.page_number = $page_number
-            """
-            chunk_parameters = {
-                "chunk_id": chunk.chunk_id,
-                "chunk_index": chunk.chunk_index,
-                "text": chunk.content,
-                "embedding": chunk.embedding,
-                "doc_name": doc_name,
-                "page_number": chunk.page_number
-            }
-            self.execute_query(create_chunk_query, chunk_parameters)
-            
-            # Link Chunk to Page
-            link_chunk_to_page_query = """
-            MATCH (p:Page {doc_name: $doc_name, page_number: $page_number})
-            MATCH (c:ResponseChunk {chunk_id: $chunk_id})
-            MERGE (p)-[:HAS_CHUNK]->(c)
-            MERGE (c)-[:HAS_PAGE]->(p)
-            """
-            link_page_parameters = {
-                "doc_name": doc_name,
-                "page_number": chunk.page_number,
-                "chunk_id": chunk.chunk_id
-            }
-            self.execute_query(link_chunk_to_page_query, link_page_parameters)
-        
-        logger.info(f"✓ Created {len(chunks)} ResponseChunk nodes and linked to pages")
+    async def create_response_chunk_nodes(self, chunk_parameters: Dict[str, Any]):
+        """Create ResponseChunk nodes for all embedded chunks and link them to pages in one query"""
+        chunk_count = len(chunk_parameters["chunk_ids"])
+        logger.info(
+            "Creating %d ResponseChunk nodes for document: %s",
+            chunk_count, chunk_parameters["doc_name"]
+        )
+        await self.write_chunks(_Q_MERGE_RESPONSE_CHUNKS, _MERGE_RESPONSE_CHUNK, chunk_parameters)
+        
+        logger.info("✓ Created %d ResponseChunk nodes and linked to pages", chunk_count)
     
-    def build_graph(self, document_id: str, chunks: List[EmbeddedChunkData], rfp_name: str = None) -> int:
+    async def build_graph(self, document_id: str, chunks: List[EmbeddedChunkData], rfp_name: str = None) -> int:
         """
         Build the knowledge graph from embedded chunks for a response document
         
@@ -405,25 +530,26 @@ class ResponseGraphBuilder(GraphBuilder):
             else:
                 rfp_name = "Unknown RFP"
         
-        logger.info(f"\n{'='*60}")
-        logger.info(f"Building graph for response document: {doc_name}")
-        logger.info(f"RFP: {rfp_name}")
-        logger.info(f"{'='*60}\n")
+        logger.info("Building graph for response document: %s", doc_name)
+        logger.info("RFP: %s", rfp_name)
+        
+        # Build the chunk payload before any query is issued
+        chunk_parameters = build_chunk_parameters(doc_name, chunks)
         
         nodes_created = 0
         
         # Create Document node and link to RFP
-        self.create_document_node(doc_name, source, doc_type, rfp_name)
+        await self.create_document_node(doc_name, source, doc_type, rfp_name)
         nodes_created += 1
         
         # Create Page nodes and link to Document
         pages_set = set(chunk.page_number for chunk in chunks)
-        self.create_page_nodes(doc_name, chunks)
+        await self.create_page_nodes(doc_name, chunks)
         nodes_created += len(pages_set)
         
         # Create ResponseChunk nodes and link to Pages
-        self.create_response_chunk_nodes(doc_name, chunks)
+        await self.create_response_chunk_nodes(chunk_parameters)
         nodes_created += len(chunks)
         
-        logger.info(f"\n✓ Graph building complete for {doc_name}. Created {nodes_created} nodes\n")
+        logger.info("✓ Graph building complete for %s. Created %d nodes", doc_name, nodes_created)
         return nodes_created
@@ -22,7 +22,6 @@ class WorkflowState(TypedDict):
     year: int
     chunks: list
     nodes_created: int
-    error: str
     neo4j_config: dict
 
 
@@ -35,34 +34,30 @@ def determine_document_type(state: WorkflowState) -> WorkflowState:
         
     Returns:
         Updated state with doc_type determined
+        
+    Raises:
+        ValueError: If there are no chunks or the doc_type is missing
     """
     logger.info("Step 1: Determining document type")
     
-    try:
-        chunks = state["chunks"]
-        if not chunks:
-            state["error"] = "No chunks provided"
-            return state
-        
-        # Get doc_type from first chunk's metadata
-        first_chunk = chunks[0]
-        doc_type = first_chunk.metadata.doc_type
-        
-        if not doc_type:
-            state["error"] = "doc_type not found in chunk metadata"
-            return state
-        
-        state["doc_type"] = doc_type
-        
-        # Also extract location and year for potential use
-        state["location"] = first_chunk.metadata.location
-        state["year"] = first_chunk.metadata.year
-        
-        logger.info(f"Determined document type: {doc_type}")
-        
-    except Exception as e:
-        logger.error(f"Error determining document type: {e}")
-        state["error"] = str(e)
+    chunks = state["chunks"]
+    if not chunks:
+        raise ValueError("No chunks provided")
+    
+    # Get doc_type from first chunk's metadata
+    first_chunk = chunks[0]
+    doc_type = first_chunk.metadata.doc_type
+    
+    if not doc_type:
+        raise ValueError("doc_type not found in chunk metadata")
+    
+    state["doc_type"] = doc_type
+    
+    # Also extract location and year for potential use
+    state["location"] = first_chunk.metadata.location
+    state["year"] = first_chunk.metadata.year
+    
+    logger.info(f"Determined document type: {doc_type}")
     
     return state
 
@@ -77,11 +72,7 @@ def route_by_document_type(state: WorkflowState) -> str:
     Returns:
         Name of the next node to execute
     """
-    if state.get("error"):
-        logger.error(f"Error in workflow, ending: {state['error']}")
-        return "end"
-    
-    doc_type = state.get("doc_type", "").lower()
+    doc_type = state["doc_type"].lower()
     
     if doc_type == "request":
         logger.info("Routing to request graph builder")
@@ -94,7 +85,7 @@ def route_by_document_type(state: WorkflowState) -> str:
         return "build_request_graph"
 
 
-def build_request_graph(state: WorkflowState) -> WorkflowState:
+async def build_request_graph(state: WorkflowState) -> WorkflowState:
     """
     Build knowledge graph for request documents.
     
@@ -106,33 +97,28 @@ def build_request_graph(state: WorkflowState) -> WorkflowState:
     """
     logger.info("Step 2: Building request document graph")
     
+    neo4j_config = state["neo4j_config"]
+    builder = RequestGraphBuilder(
+        uri=neo4j_config["uri"],
+        username=neo4j_config["username"],
+        password=neo4j_config["password"],
+        database=neo4j_config["database"]
+    )
+    
     try:
-        neo4j_config = state["neo4j_config"]
-        builder = RequestGraphBuilder(
-            uri=neo4j_config["uri"],
-            username=neo4j_config["username"],
-            password=neo4j_config["password"],
-            database=neo4j_config["database"]
+        nodes_created = await builder.build_graph(
+            document_id=state["document_id"],
+            chunks=state["chunks"]
         )
-        
-        try:
-            nodes_created = builder.build_graph(
-                document_id=state["document_id"],
-                chunks=state["chunks"]
-            )
-            state["nodes_created"] = nodes_created
-            logger.info(f"Successfully created {nodes_created} nodes for request document")
-        finally:
-            builder.close()
-            
-    except Exception as e:
-        logger.error(f"Error building request graph: {e}")
-        state["error"] = str(e)
+        state["nodes_created"] = nodes_created
+        logger.info(f"Successfully created {nodes_created} nodes for request document")
+    finally:
+        await builder.close()
     
     return state
 
 
-def build_response_graph(state: WorkflowState) -> WorkflowState:
+async def build_response_graph(state: WorkflowState) -> WorkflowState:
     """
     Build knowledge graph for response documents.
     
@@ -144,34 +130,29 @@ def build_response_graph(state: WorkflowState) -> WorkflowState:
     """
     logger.info("Step 2: Building response document graph")
     
+    neo4j_config = state["neo4j_config"]
+    builder = ResponseGraphBuilder(
+        uri=neo4j_config["uri"],
+        username=neo4j_config["username"],
+        password=neo4j_config["password"],
+        database=neo4j_config["database"]
+    )
+    
     try:
-        neo4j_config = state["neo4j_config"]
-        builder = ResponseGraphBuilder(
-            uri=neo4j_config["uri"],
-            username=neo4j_config["username"],
-            password=neo4j_config["password"],
-            database=neo4j_config["database"]
-        )
+        # Derive RFP name from metadata if available
+        rfp_name = None
+        if state.get("location") and state.get("year"):
+            rfp_name = f"{state['location']} RFP {str(state['year'])[-2:]}"
         
-        try:
-            # Derive RFP name from metadata if available
-            rfp_name = None
-            if state.get("location") and state.get("year"):
-                rfp_name = f"{state['location']} RFP {str(state['year'])[-2:]}"
-            
-            nodes_created = builder.build_graph(
-                document_id=state["document_id"],
-                chunks=state["chunks"],
-                rfp_name=rfp_name
-            )
-            state["nodes_created"] = nodes_created
-            logger.info(f"Successfully created {nodes_created} nodes for response document")
-        finally:
-            builder.close()
-            
-    except Exception as e:
-        logger.error(f"Error building response graph: {e}")
-        state["error"] = str(e)
+        nodes_created = await builder.build_graph(
+            document_id=state["document_id"],
+            chunks=state["chunks"],
+            rfp_name=rfp_name
+        )
+        state["nodes_created"] = nodes_created
+        logger.info(f"Successfully created {nodes_created} nodes for response document")
+    finally:
+        await builder.close()
     
     return state
 
@@ -200,8 +181,7 @@ def create_graph_workflow():
         route_by_document_type,
         {
             "build_request_graph": "build_request_graph",
-            "build_response_graph": "build_response_graph",
-            "end": END
+            "build_response_graph": "build_response_graph"
         }
     )
     
@@ -216,7 +196,7 @@ def create_graph_workflow():
     return app
 
 
-def process_document_chunks(
+async def process_document_chunks(
     document_id: str,
     chunks: list,
     neo4j_config: dict
@@ -245,12 +225,21 @@ def process_document_chunks(
         "year": None,
         "chunks": chunks,
         "nodes_created": 0,
-        "error": None,
         "neo4j_config": neo4j_config
     }
     
-    # Run workflow
-    final_state = app.invoke(initial_state)
+    # Run workflow; any node failure ends the run and is reported in the result
+    try:
+        final_state = await app.ainvoke(initial_state)
+    except Exception as e:
+        logger.error(f"Error in workflow, ending: {e}")
+        return {
+            "document_id": document_id,
+            "doc_type": "",
+            "total_chunks": len(chunks),
+            "nodes_created": 0,
+            "error": str(e)
+        }
     
     # Return results
     return {
@@ -258,5 +247,5 @@ def process_document_chunks(
         "doc_type": final_state["doc_type"],
         "total_chunks": len(chunks),
         "nodes_created": final_state["nodes_created"],
-        "error": final_state.get("error")
+        "error": None
     }
@@ -4,19 +4,25 @@ Downloads embedded chunks from Azure Blob Storage and processes them through
 a LangGraph pipeline to create graph representations in Neo4j.
 """
 
-import json
+import asyncio
 import logging
 import traceback
-from typing import List
+from typing import AsyncIterator, List
 
+from cachetools import TTLCache
 from dotenv import load_dotenv
-from azure.identity import DefaultAzureCredential
-from azure.storage.blob import BlobServiceClient
+from azure.identity.aio import DefaultAzureCredential
+from azure.core import MatchConditions
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
+from azure.storage.blob.aio import BlobServiceClient, ContainerClient, StorageStreamDownloader
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
 
 from config import AzureBlobStorageConfig, Neo4jConfig
 from models import BuildGraphRequest, BuildGraphResponse, EmbeddedChunkData
 from graph_workflow import process_document_chunks
+from graph_builder import close_drivers, get_driver
 
 # Load environment variables from a local .env file if present
 load_dotenv()
@@ -31,7 +37,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Graph Data API",
     description="API for building knowledge graphs from document chunks stored in Azure Blob Storage",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Initialize configuration
@@ -49,10 +56,135 @@ except ValueError as e:
     logger.error(f"Neo4j configuration error: {e}")
     neo4j_config = None
 
+# Connection settings handed to the graph builders; they never change after startup
+neo4j_config_dict = {
+    "uri": neo4j_config.uri,
+    "username": neo4j_config.username,
+    "password": neo4j_config.password,
+    "database": neo4j_config.database
+} if neo4j_config else None
 
-def download_embedded_chunks_from_blob_storage(document_id: str) -> List[EmbeddedChunkData]:
+
+# The credential and blob client are long-lived and shared by all requests, so the
+# credential chain probe, token acquisition and TLS setup happen once per process
+credential = DefaultAzureCredential()
+
+
+def create_blob_service_client(config: AzureBlobStorageConfig) -> BlobServiceClient:
+    """
+    Create the async BlobServiceClient shared by all requests.
+    
+    Args:
+        config: Azure Blob Storage configuration
+        
+    Returns:
+        BlobServiceClient authenticated with DefaultAzureCredential
+    """
+    account_url = f"https://{config.storage_account}.blob.core.windows.net"
+    return BlobServiceClient(
+        account_url=account_url,
+        credential=credential,
+        # Keep each GET small: the first GET of a download is buffered whole before chunks()
+        # yields anything, so a large first GET would hold chunks.jsonl in memory
+        max_single_get_size=4 * 1024 * 1024,
+        max_chunk_get_size=4 * 1024 * 1024,
+        connection_timeout=10
+    )
+
+
+blob_service_client = create_blob_service_client(blob_config) if blob_config else None
+
+# Parsed chunks of recently requested documents, revalidated against the chunks.jsonl ETag on
+# every request; POST /refresh/{document_id} drops an entry outright
+CHUNK_CACHE_MAX_DOCUMENTS = 32
+CHUNK_CACHE_TTL_SECONDS = 600
+chunk_cache = TTLCache(maxsize=CHUNK_CACHE_MAX_DOCUMENTS, ttl=CHUNK_CACHE_TTL_SECONDS)
+
+# The async clients share aiohttp's connection pool (100 connections by default); cap in-flight
+# requests below that so parallel work reuses pooled connections instead of queueing for new ones
+BLOB_DOWNLOAD_CONCURRENCY = 64
+blob_download_slots = asyncio.Semaphore(BLOB_DOWNLOAD_CONCURRENCY)
+
+
+# Validates a whole list of chunks in a single pydantic-core call
+chunk_list_adapter = TypeAdapter(List[EmbeddedChunkData])
+
+# Lines of chunks.jsonl validated per call while the blob streams in, so only one group
+# of raw lines is held alongside the validated chunks
+CHUNK_VALIDATION_BATCH_SIZE = 500
+
+
+def validate_json_chunks(json_chunks: List[bytes]) -> List[EmbeddedChunkData]:
+    """
+    Validate JSON-encoded chunks as one JSON array instead of one model at a time.
+    
+    Args:
+        json_chunks: Raw JSON objects, one per chunk
+        
+    Returns:
+        List of EmbeddedChunkData objects
+    """
+    return chunk_list_adapter.validate_json(b"[" + b",".join(json_chunks) + b"]")
+
+
+async def iter_jsonl_lines(download_stream: StorageStreamDownloader) -> AsyncIterator[bytes]:
+    """
+    Yield the lines of a JSON Lines blob as its content streams in, without
+    buffering the whole blob in memory.
+    
+    Args:
+        download_stream: Downloader returned by download_blob
+        
+    Yields:
+        Each non-empty line of the blob
+    """
+    leftover = b""
+    async for data in download_stream.chunks():
+        lines = (leftover + data).split(b"\n")
+        # The last piece is a partial line until the next chunk (or the end of the blob) completes it
+        leftover = lines.pop()
+        for line in lines:
+            if line:
+                yield line
+    if leftover:
+        yield leftover
+
+
+async def download_chunk_blobs(container_client: ContainerClient, document_id: str) -> List[EmbeddedChunkData]:
+    """
+    Download a document's chunks from the legacy one-blob-per-chunk layout.
+    
+    Args:
+        container_client: Client for the embedding container
+        document_id: ID of the document
+        
+    Returns:
+        List of EmbeddedChunkData objects
+    """
+    async def download_chunk(blob_name: str) -> bytes:
+        logger.debug("Downloading blob: %s", blob_name)
+        # Chunk blobs are small enough for a single GET; concurrency comes from downloading blobs in parallel
+        async with blob_download_slots:
+            download_stream = await container_client.download_blob(blob_name, max_concurrency=1)
+            return await download_stream.readall()
+    
+    # List the document's folder for its per-chunk JSON blobs
+    blob_prefix = f"{document_id}/"
+    logger.info(f"Listing blobs with prefix: {blob_prefix}")
+    names = [
+        blob.name
+        async for blob in container_client.list_blobs(name_starts_with=blob_prefix, results_per_page=5000)
+        if blob.name.endswith('.json')
+    ]
+    
+    # Download all chunk blobs concurrently, then validate them in one batch
+    json_chunks = await asyncio.gather(*[download_chunk(blob_name) for blob_name in names])
+    return validate_json_chunks(json_chunks)
+
+
+async def download_embedded_chunks_from_blob_storage(document_id: str) -> List[EmbeddedChunkData]:
     """
-    Download all embedded chunk JSON files for a document from Azure Blob Storage.
+    Download all embedded chunks for a document from Azure Blob Storage.
     
     Args:
         document_id: ID of the document
@@ -69,42 +201,50 @@ def download_embedded_chunks_from_blob_storage(document_id: str) -> List[Embedde
             detail="Azure Blob Storage configuration is not properly set"
         )
     
+    # Cache entries are (ETag of chunks.jsonl, chunks); the ETag is None for legacy documents
+    cached_etag, cached_chunks = chunk_cache.get(document_id, (None, None))
+    
     try:
-        logger.info(f"Downloading embedded chunks for document_id: {document_id}")
-        # Create blob service client with DefaultAzureCredential
-        account_url = f"https://{blob_config.storage_account}.blob.core.windows.net"
-        credential = DefaultAzureCredential()
-        blob_service_client = BlobServiceClient(
-            account_url=account_url,
-            credential=credential
-        )
-        
         # Get container client
         container_client = blob_service_client.get_container_client(
             blob_config.embedding_container
         )
         
-        # List all blobs in the document's folder
-        blob_prefix = f"{document_id}/"
-        logger.info(f"Listing blobs with prefix: {blob_prefix}")
-        blobs = container_client.list_blobs(name_starts_with=blob_prefix)
-        
-        chunks = []
-        for blob in blobs:
-            if blob.name.endswith('.json'):
-                logger.debug(f"Downloading blob: {blob.name}")
-                # Download the blob
-                blob_client = blob_service_client.get_blob_client(
-                    container=blob_config.embedding_container,
-                    blob=blob.name
-                )
-                
-                download_stream = blob_client.download_blob()
-                content = download_stream.readall()
-                
-                # Parse JSON content
-                chunk_data = json.loads(content)
-                chunks.append(EmbeddedChunkData(**chunk_data))
+        # Chunks are written as one JSON Lines blob per document; documents embedded by
+        # earlier versions of the embedding API have one blob per chunk instead. Cached
+        # chunks are only reused while chunks.jsonl is unchanged (or, for legacy documents,
+        # still absent), so re-embedding a document is picked up without a refresh
+        try:
+            conditions = (
+                {"etag": cached_etag, "match_condition": MatchConditions.IfModified}
+                if cached_etag else {}
+            )
+            # chunks() fetches ranges one after another, so no max_concurrency here
+            download_stream = await container_client.download_blob(f"{document_id}/chunks.jsonl", **conditions)
+            logger.info(f"Downloading embedded chunks for document_id: {document_id}")
+            etag = download_stream.properties.etag
+            chunks = []
+            lines: List[bytes] = []
+            async for line in iter_jsonl_lines(download_stream):
+                lines.append(line)
+                if len(lines) == CHUNK_VALIDATION_BATCH_SIZE:
+                    chunks.extend(validate_json_chunks(lines))
+                    lines = []
+            if lines:
+                chunks.extend(validate_json_chunks(lines))
+        except ResourceNotFoundError:
+            if cached_chunks is not None and cached_etag is None:
+                logger.info(f"Using {len(cached_chunks)} cached embedded chunks for document_id: {document_id}")
+                return cached_chunks
+            logger.info(f"No chunks.jsonl blob for document_id {document_id}, reading per-chunk blobs")
+            etag = None
+            chunks = await download_chunk_blobs(container_client, document_id)
+        except HttpResponseError as e:
+            # 304 Not Modified: chunks.jsonl still matches the cached ETag
+            if e.status_code != 304:
+                raise
+            logger.info(f"Using {len(cached_chunks)} cached embedded chunks for document_id: {document_id}")
+            return cached_chunks
         
         if not chunks:
             logger.warning(f"No embedded chunk files found for document_id: {document_id}")
@@ -114,6 +254,7 @@ def download_embedded_chunks_from_blob_storage(document_id: str) -> List[Embedde
             )
         
         logger.info(f"Successfully downloaded {len(chunks)} embedded chunks for document_id: {document_id}")
+        chunk_cache[document_id] = (etag, chunks)
         return chunks
         
     except HTTPException:
@@ -127,6 +268,25 @@ def download_embedded_chunks_from_blob_storage(document_id: str) -> List[Embedde
         )
 
 
+@app.on_event("startup")
+async def startup():
+    """Create the shared Neo4j driver so the first graph build reuses an open connection pool."""
+    if neo4j_config_dict:
+        try:
+            await get_driver(**neo4j_config_dict).verify_connectivity()
+        except Exception as e:
+            logger.warning(f"Neo4j is not reachable at startup: {str(e)}")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close pooled Neo4j and Blob Storage connections when the application stops."""
+    await close_drivers()
+    if blob_service_client:
+        await blob_service_client.close()
+    await credential.close()
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -146,6 +306,25 @@ async def health_check():
     }
 
 
+@app.post("/refresh/{document_id}")
+async def refresh_document(document_id: str):
+    """
+    Drop a document's cached chunks so the next request downloads them again.
+    
+    Args:
+        document_id: ID of the document whose chunk blobs changed
+        
+    Returns:
+        Whether cached chunks were dropped for the document
+    """
+    was_cached = chunk_cache.pop(document_id, None) is not None
+    logger.info(f"Refreshed document_id: {document_id} (cached: {was_cached})")
+    return {
+        "document_id": document_id,
+        "was_cached": was_cached
+    }
+
+
 @app.post("/build-graph", response_model=BuildGraphResponse)
 async def build_graph(request: BuildGraphRequest):
     """
@@ -175,19 +354,12 @@ async def build_graph(request: BuildGraphRequest):
         
         # 1) Download embedded chunks from blob storage
         logger.info("Step 1: Downloading embedded chunks from blob storage")
-        chunks = download_embedded_chunks_from_blob_storage(request.document_id)
+        chunks = await download_embedded_chunks_from_blob_storage(request.document_id)
         logger.info(f"Downloaded {len(chunks)} embedded chunks")
         
         # 2) Process chunks through LangGraph workflow
         logger.info("Step 2: Processing chunks through LangGraph workflow")
-        neo4j_config_dict = {
-            "uri": neo4j_config.uri,
-            "username": neo4j_config.username,
-            "password": neo4j_config.password,
-            "database": neo4j_config.database
-        }
-        
-        result = process_document_chunks(
+        result = await process_document_chunks(
             document_id=request.document_id,
             chunks=chunks,
             neo4j_config=neo4j_config_dict
@@ -226,4 +398,13 @@ if __name__ == "__main__":
     import os
     import uvicorn
     port = int(os.getenv("PORT", 8004))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    workers = int(os.getenv("WORKERS", "1"))
+    # Multiple worker processes need an import string so each worker can load the app
+    uvicorn.run(
+        "main:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=workers
+    )
@@ -2,8 +2,33 @@
 Pydantic models for the Graph Data API.
 """
 
-from typing import List, Optional
-from pydantic import BaseModel, Field
+import base64
+from typing import Annotated, Any, List, Optional
+
+import numpy as np
+from pydantic import BaseModel, BeforeValidator, Field, PlainSerializer
+
+
+# Embeddings are stored as float16 so blobs carry 2 bytes per dimension instead of a decimal string
+EMBEDDING_DTYPE = np.float16
+
+
+def decode_embedding(value: Any) -> np.ndarray:
+    """
+    Convert a stored embedding into a contiguous float32 array.
+    
+    Args:
+        value: A base64 string of float16 bytes (as written by the embedding API), raw
+            float16 bytes, a numpy array, or a legacy list of floats
+        
+    Returns:
+        Embedding as a 1-D float32 array
+    """
+    if isinstance(value, str):
+        value = base64.b64decode(value)
+    if isinstance(value, (bytes, bytearray)):
+        return np.frombuffer(value, dtype=EMBEDDING_DTYPE).astype(np.float32)
+    return np.asarray(value, dtype=np.float32)
 
 
 class BuildGraphRequest(BaseModel):
@@ -76,9 +101,14 @@ class EmbeddedChunkData(BaseModel):
     page_number: int = Field(..., description="Page number where this chunk appears")
     content: str = Field(..., description="Text content of the chunk")
     metadata: ChunkMetadata = Field(..., description="Metadata associated with the chunk")
-    embedding: List[float] = Field(..., description="Vector embedding of the chunk content")
+    embedding: Annotated[
+        np.ndarray,
+        BeforeValidator(decode_embedding),
+        PlainSerializer(lambda embedding: embedding.tolist(), return_type=List[float])
+    ] = Field(..., description="Vector embedding of the chunk content as a float32 array")
     
     class Config:
+        arbitrary_types_allowed = True
         json_schema_extra = {
             "example": {
                 "chunk_id": "9b7b3e33-07da-4fe5-9467-6de3074e26c9_0",
@@ -92,7 +122,7 @@ class EmbeddedChunkData(BaseModel):
                     "doc_type": "request",
                     "document_id": "9b7b3e33-07da-4fe5-9467-6de3074e26c9"
                 },
-                "embedding": [0.009, -0.031, 0.039]
+                "embedding": "nCDwp/4o"
             }
         }
 
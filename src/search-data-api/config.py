@@ -6,6 +6,10 @@ import os
 from typing import List
 
 
+# Dimension of the deployment's embedding model (1536 for text-embedding-ada-002)
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "1536"))
+
+
 class AzureBlobStorageConfig:
     """Configuration for Azure Blob Storage."""
     
@@ -3,18 +3,22 @@ FastAPI application for uploading document chunks to Azure AI Search.
 Downloads embedded chunks from Azure Blob Storage and uploads them to an Azure AI Search index.
 """
 
-import json
+import asyncio
 import logging
+import time
 import traceback
 from datetime import datetime
-from typing import List
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional, Set
 
+from cachetools import TTLCache
 from dotenv import load_dotenv
 from azure.identity import DefaultAzureCredential
-from azure.storage.blob import BlobServiceClient
-from azure.search.documents import SearchClient
+from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential
+from azure.storage.blob.aio import BlobServiceClient, ContainerClient, StorageStreamDownloader
+from azure.search.documents.aio import SearchClient
 from azure.search.documents.indexes import SearchIndexClient
 from azure.core.credentials import AzureKeyCredential
+from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
 from azure.keyvault.secrets import SecretClient
 from azure.search.documents.indexes.models import (
     SearchIndex,
@@ -27,9 +31,17 @@ from azure.search.documents.indexes.models import (
     SearchField
 )
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 
-from config import AzureBlobStorageConfig, AzureSearchConfig
-from models import UploadDocumentRequest, UploadDocumentResponse, EmbeddedChunkData
+from config import EMBEDDING_DIM, AzureBlobStorageConfig, AzureSearchConfig
+from models import (
+    UploadDocumentRequest,
+    UploadDocumentResponse,
+    ChunkBatch,
+    EmbeddedChunkStruct,
+    chunk_list_json_decoder,
+    intern_chunk_metadata
+)
 
 # Load environment variables from a local .env file if present
 load_dotenv()
@@ -44,7 +56,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Search Data API",
     description="API for uploading document chunks from Azure Blob Storage to Azure AI Search",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Initialize configuration
@@ -63,9 +76,76 @@ except ValueError as e:
     search_config = None
 
 
+# Credentials and service clients are long-lived and shared by all requests, so the
+# credential chain probe, token acquisition and TLS setup happen once per process
+credential = DefaultAzureCredential()
+async_credential = AsyncDefaultAzureCredential()
+
+
+def create_blob_service_client(config: AzureBlobStorageConfig) -> BlobServiceClient:
+    """
+    Create the async BlobServiceClient shared by all requests.
+    
+    Args:
+        config: Azure Blob Storage configuration
+        
+    Returns:
+        BlobServiceClient authenticated with DefaultAzureCredential
+    """
+    account_url = f"https://{config.storage_account}.blob.core.windows.net"
+    return BlobServiceClient(
+        account_url=account_url,
+        credential=async_credential,
+        # Keep each GET small: the first GET of a download is buffered whole before chunks()
+        # yields anything, so a large first GET would hold chunks.jsonl in memory
+        max_single_get_size=4 * 1024 * 1024,
+        max_chunk_get_size=4 * 1024 * 1024,
+        connection_timeout=10
+    )
+
+
+blob_service_client = create_blob_service_client(blob_config) if blob_config else None
+
+# Parsed chunks of recently requested legacy (one blob per chunk) documents, used only while
+# the document has no chunks.jsonl; POST /refresh/{document_id} drops an entry outright
+CHUNK_CACHE_MAX_DOCUMENTS = 32
+CHUNK_CACHE_TTL_SECONDS = 600
+chunk_cache = TTLCache(maxsize=CHUNK_CACHE_MAX_DOCUMENTS, ttl=CHUNK_CACHE_TTL_SECONDS)
+
+# The async clients share aiohttp's connection pool (100 connections by default); cap in-flight
+# requests below that so parallel work reuses pooled connections instead of queueing for new ones
+BLOB_DOWNLOAD_CONCURRENCY = 64
+blob_download_slots = asyncio.Semaphore(BLOB_DOWNLOAD_CONCURRENCY)
+SEARCH_UPLOAD_CONCURRENCY = 8
+# Chunks per upload_documents call. Azure AI Search allows 1000 documents but only 16 MB per
+# indexing request, and a document is sent as JSON: a 1536-dimension vector as decimal floats
+# plus its content comes to ~32 KB, so 250 documents (~8 MB) leaves headroom for long chunks
+SEARCH_UPLOAD_BATCH_SIZE = 250
+search_upload_slots = asyncio.Semaphore(SEARCH_UPLOAD_CONCURRENCY)
+secret_client = (
+    SecretClient(vault_url=search_config.key_vault_url, credential=credential)
+    if search_config else None
+)
+
+# Search clients authenticate with the admin key, so they are created on first use
+search_index_client: Optional[SearchIndexClient] = None
+search_clients: Dict[str, SearchClient] = {}
+
+# The admin key is cached in-process and re-read from Key Vault once the TTL expires
+# or after Azure AI Search rejects it
+SEARCH_ADMIN_KEY_TTL_SECONDS = 600
+search_admin_key: Optional[str] = None
+search_admin_key_fetched_at = 0.0
+search_credential: Optional[AzureKeyCredential] = None
+
+# Indexes confirmed to exist; once an index exists it is never re-checked
+verified_indexes: Set[str] = set()
+
+
 def get_search_admin_key() -> str:
     """
-    Retrieve the Azure AI Search admin key from Key Vault.
+    Retrieve the Azure AI Search admin key, reading it from Key Vault when the
+    cached value is missing or older than SEARCH_ADMIN_KEY_TTL_SECONDS.
     
     Returns:
         The admin key as a string
@@ -79,15 +159,15 @@ def get_search_admin_key() -> str:
             detail="Azure AI Search configuration is not properly set"
         )
     
+    global search_admin_key, search_admin_key_fetched_at
+    if search_admin_key and time.monotonic() - search_admin_key_fetched_at < SEARCH_ADMIN_KEY_TTL_SECONDS:
+        return search_admin_key
+    
     try:
-        credential = DefaultAzureCredential()
-        secret_client = SecretClient(
-            vault_url=search_config.key_vault_url,
-            credential=credential
-        )
-        
         secret = secret_client.get_secret("AzureSearch--AdminKey")
-        return secret.value
+        search_admin_key = secret.value
+        search_admin_key_fetched_at = time.monotonic()
+        return search_admin_key
         
     except Exception as e:
         logger.error(f"Error retrieving search admin key from Key Vault: {str(e)}")
@@ -97,6 +177,76 @@ def get_search_admin_key() -> str:
         )
 
 
+def invalidate_search_admin_key_on_auth_error(error: Exception):
+    """
+    Expire the cached admin key when Azure AI Search rejects it, so the next
+    request re-reads the (possibly rotated) key from Key Vault.
+    
+    Args:
+        error: Exception raised by a search operation
+    """
+    global search_admin_key_fetched_at
+    if isinstance(error, HttpResponseError) and error.status_code in (401, 403):
+        logger.warning("Search admin key was rejected, refreshing it from Key Vault on next use")
+        search_admin_key_fetched_at = 0.0
+
+
+def get_search_credential() -> AzureKeyCredential:
+    """
+    Get the AzureKeyCredential shared by all search clients, updating it in place
+    when the cached admin key has been refreshed.
+    
+    Returns:
+        AzureKeyCredential holding the current search admin key
+    """
+    global search_credential
+    admin_key = get_search_admin_key()
+    if search_credential is None:
+        search_credential = AzureKeyCredential(admin_key)
+    elif search_credential.key != admin_key:
+        search_credential.update(admin_key)
+    return search_credential
+
+
+def get_search_index_client() -> SearchIndexClient:
+    """
+    Get the shared SearchIndexClient, creating it on first use.
+    
+    Returns:
+        SearchIndexClient authenticated with the search admin key
+    """
+    global search_index_client
+    key_credential = get_search_credential()
+    if search_index_client is None:
+        search_index_client = SearchIndexClient(
+            endpoint=search_config.endpoint,
+            credential=key_credential
+        )
+    return search_index_client
+
+
+def get_search_client(index_name: str) -> SearchClient:
+    """
+    Get the shared SearchClient for an index, creating it on first use.
+    
+    Args:
+        index_name: Name of the index the client targets
+        
+    Returns:
+        SearchClient authenticated with the search admin key
+    """
+    key_credential = get_search_credential()
+    search_client = search_clients.get(index_name)
+    if search_client is None:
+        search_client = SearchClient(
+            endpoint=search_config.endpoint,
+            index_name=index_name,
+            credential=key_credential
+        )
+        search_clients[index_name] = search_client
+    return search_client
+
+
 def ensure_search_index_exists(index_name: str):
     """
     Ensure the Azure AI Search index exists with the correct schema.
@@ -111,19 +261,18 @@ def ensure_search_index_exists(index_name: str):
             detail="Azure AI Search configuration is not properly set"
         )
     
+    if index_name in verified_indexes:
+        return
+    
     try:
-        # Create index client with admin key for index management
-        admin_key = get_search_admin_key()
-        credential = AzureKeyCredential(admin_key)
-        index_client = SearchIndexClient(
-            endpoint=search_config.endpoint,
-            credential=credential
-        )
+        # Index client with admin key for index management
+        index_client = get_search_index_client()
         
         # Check if index exists
         try:
             index_client.get_index(index_name)
             logger.info(f"Index '{index_name}' already exists")
+            verified_indexes.add(index_name)
             return
         except Exception:
             logger.info(f"Index '{index_name}' does not exist, creating...")
@@ -149,7 +298,7 @@ def ensure_search_index_exists(index_name: str):
                 name="vector",
                 type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
                 searchable=True,
-                vector_search_dimensions=1536,
+                vector_search_dimensions=EMBEDDING_DIM,
                 vector_search_profile_name="vector-profile"
             )
         ]
@@ -178,8 +327,10 @@ def ensure_search_index_exists(index_name: str):
         
         index_client.create_index(index)
         logger.info(f"Successfully created index '{index_name}'")
+        verified_indexes.add(index_name)
         
     except Exception as e:
+        invalidate_search_admin_key_on_auth_error(e)
         logger.error(f"Error ensuring search index exists: {str(e)}")
         logger.error(f"Traceback: {traceback.format_exc()}")
         raise HTTPException(
@@ -188,15 +339,87 @@ def ensure_search_index_exists(index_name: str):
         )
 
 
-def download_embedded_chunks_from_blob_storage(document_id: str) -> List[EmbeddedChunkData]:
+def decode_json_chunks(json_chunks: List[bytes]) -> List[EmbeddedChunkStruct]:
+    """
+    Decode JSON-encoded chunks as one JSON array instead of one object at a time.
+    
+    Args:
+        json_chunks: Raw JSON objects, one per chunk
+        
+    Returns:
+        List of EmbeddedChunkStruct objects
+    """
+    return chunk_list_json_decoder.decode(b"[" + b",".join(json_chunks) + b"]")
+
+
+async def iter_jsonl_lines(download_stream: StorageStreamDownloader) -> AsyncIterator[bytes]:
+    """
+    Yield the lines of a JSON Lines blob as its content streams in, without
+    buffering the whole blob in memory.
+    
+    Args:
+        download_stream: Downloader returned by download_blob
+        
+    Yields:
+        Each non-empty line of the blob
+    """
+    leftover = b""
+    async for data in download_stream.chunks():
+        lines = (leftover + data).split(b"\n")
+        # The last piece is a partial line until the next chunk (or the end of the blob) completes it
+        leftover = lines.pop()
+        for line in lines:
+            if line:
+                yield line
+    if leftover:
+        yield leftover
+
+
+async def download_chunk_blobs(container_client: ContainerClient, document_id: str) -> List[EmbeddedChunkStruct]:
     """
-    Download all embedded chunk JSON files for a document from Azure Blob Storage.
+    Download a document's chunks from the legacy one-blob-per-chunk layout.
     
     Args:
+        container_client: Client for the embedding container
         document_id: ID of the document
         
     Returns:
-        List of EmbeddedChunkData objects
+        List of EmbeddedChunkStruct objects
+    """
+    async def download_chunk(blob_name: str) -> bytes:
+        logger.debug("Downloading blob: %s", blob_name)
+        # Chunk blobs are small enough for a single GET; concurrency comes from downloading blobs in parallel
+        async with blob_download_slots:
+            download_stream = await container_client.download_blob(blob_name, max_concurrency=1)
+            return await download_stream.readall()
+    
+    # List the document's folder for its per-chunk JSON blobs
+    blob_prefix = f"{document_id}/"
+    logger.info(f"Listing blobs with prefix: {blob_prefix}")
+    names = [
+        blob.name
+        async for blob in container_client.list_blobs(name_starts_with=blob_prefix, results_per_page=5000)
+        if blob.name.endswith('.json')
+    ]
+    
+    # Download all chunk blobs concurrently, then decode them in one batch
+    json_chunks = await asyncio.gather(*[download_chunk(blob_name) for blob_name in names])
+    return decode_json_chunks(json_chunks)
+
+
+async def iter_embedded_chunk_batches(document_id: str) -> AsyncGenerator[List[EmbeddedChunkStruct], None]:
+    """
+    Download a document's embedded chunks from Azure Blob Storage in upload-sized batches.
+    
+    A chunks.jsonl blob is decoded batch by batch as it streams in, so only the batches
+    still being uploaded are held in memory. Documents in the legacy one-blob-per-chunk
+    layout are downloaded whole and cached.
+    
+    Args:
+        document_id: ID of the document
+        
+    Yields:
+        Lists of up to SEARCH_UPLOAD_BATCH_SIZE EmbeddedChunkStruct objects
         
     Raises:
         HTTPException: If download fails
@@ -209,50 +432,51 @@ def download_embedded_chunks_from_blob_storage(document_id: str) -> List[Embedde
     
     try:
         logger.info(f"Downloading embedded chunks for document_id: {document_id}")
-        # Create blob service client with DefaultAzureCredential
-        account_url = f"https://{blob_config.storage_account}.blob.core.windows.net"
-        credential = DefaultAzureCredential()
-        blob_service_client = BlobServiceClient(
-            account_url=account_url,
-            credential=credential
-        )
         
         # Get container client
         container_client = blob_service_client.get_container_client(
             blob_config.embedding_container
         )
         
-        # List all blobs in the document's folder
-        blob_prefix = f"{document_id}/"
-        logger.info(f"Listing blobs with prefix: {blob_prefix}")
-        blobs = container_client.list_blobs(name_starts_with=blob_prefix)
-        
-        chunks = []
-        for blob in blobs:
-            if blob.name.endswith('.json'):
-                logger.debug(f"Downloading blob: {blob.name}")
-                # Download the blob
-                blob_client = blob_service_client.get_blob_client(
-                    container=blob_config.embedding_container,
-                    blob=blob.name
-                )
-                
-                download_stream = blob_client.download_blob()
-                content = download_stream.readall()
-                
-                # Parse JSON content
-                chunk_data = json.loads(content)
-                chunks.append(EmbeddedChunkData(**chunk_data))
-        
-        if not chunks:
-            logger.warning(f"No embedded chunk files found for document_id: {document_id}")
-            raise HTTPException(
-                status_code=404,
-                detail=f"No embedded chunk files found for document_id '{document_id}'"
-            )
+        # Chunks are written as one JSON Lines blob per document; documents embedded by
+        # earlier versions of the embedding API have one blob per chunk instead. chunks.jsonl
+        # is always checked first, so a legacy document that has been re-embedded never
+        # serves its cached per-chunk blobs
+        chunks = None
+        try:
+            # chunks() fetches ranges one after another, so no max_concurrency here
+            download_stream = await container_client.download_blob(f"{document_id}/chunks.jsonl")
+            chunk_cache.pop(document_id, None)
+        except ResourceNotFoundError:
+            chunks = chunk_cache.get(document_id)
+            if chunks is not None:
+                logger.info(f"Using {len(chunks)} cached embedded chunks for document_id: {document_id}")
+            else:
+                logger.info(f"No chunks.jsonl blob for document_id {document_id}, reading per-chunk blobs")
+                chunks = await download_chunk_blobs(container_client, document_id)
+                if chunks:
+                    # Cached chunks stay in memory, so share one copy of each repeated metadata string
+                    intern_chunk_metadata(chunks)
+                    chunk_cache[document_id] = chunks
+        
+        if chunks is not None:
+            for i in range(0, len(chunks), SEARCH_UPLOAD_BATCH_SIZE):
+                yield chunks[i:i + SEARCH_UPLOAD_BATCH_SIZE]
+            return
         
-        logger.info(f"Successfully downloaded {len(chunks)} embedded chunks for document_id: {document_id}")
-        return chunks
+        lines: List[bytes] = []
+        jsonl_lines = iter_jsonl_lines(download_stream)
+        try:
+            async for line in jsonl_lines:
+                lines.append(line)
+                if len(lines) == SEARCH_UPLOAD_BATCH_SIZE:
+                    yield decode_json_chunks(lines)
+                    lines = []
+            if lines:
+                yield decode_json_chunks(lines)
+        finally:
+            # Stop reading the blob when the consumer closes this generator early
+            await jsonl_lines.aclose()
         
     except HTTPException:
         raise
@@ -265,15 +489,25 @@ def download_embedded_chunks_from_blob_storage(document_id: str) -> List[Embedde
         )
 
 
-def upload_chunks_to_search_index(chunks: List[EmbeddedChunkData], group_access_list: List[str], index_name: str):
+async def upload_chunks_to_search_index(
+    chunk_batches: AsyncGenerator[List[EmbeddedChunkStruct], None],
+    group_access_list: List[str],
+    index_name: str
+) -> int:
     """
-    Upload chunks to Azure AI Search index.
+    Upload chunks to Azure AI Search index as their batches arrive.
+    
+    Each batch is uploaded while the next one downloads. At most SEARCH_UPLOAD_CONCURRENCY
+    batches are in flight, which also bounds how many are held in memory.
     
     Args:
-        chunks: List of embedded chunk data
+        chunk_batches: Batches of embedded chunks, e.g. from iter_embedded_chunk_batches
         group_access_list: List of group IDs for access control
         index_name: Name of the index to upload to
         
+    Returns:
+        Number of chunks uploaded
+        
     Raises:
         HTTPException: If upload fails
     """
@@ -283,61 +517,83 @@ def upload_chunks_to_search_index(chunks: List[EmbeddedChunkData], group_access_
             detail="Azure AI Search configuration is not properly set"
         )
     
+    # Search client with admin key
+    search_client = get_search_client(index_name)
+    create_date = datetime.utcnow().isoformat() + "Z"
+    group_id = group_access_list[0]
+    
+    async def upload_batch(batch_number: int, documents: List[Dict[str, Any]]):
+        result = await search_client.upload_documents(documents=documents)
+        
+        # Check for errors
+        for item in result:
+            if not item.succeeded:
+                logger.error(f"Failed to upload document {item.key}: {item.error_message}")
+        logger.info(f"Uploaded batch {batch_number}")
+    
+    uploads: List[asyncio.Task] = []
+    total_chunks = 0
     try:
-        logger.info(f"Uploading {len(chunks)} chunks to search index")
-        
-        # Create search client with admin key
-        admin_key = get_search_admin_key()
-        credential = AzureKeyCredential(admin_key)
-        search_client = SearchClient(
-            endpoint=search_config.endpoint,
-            index_name=index_name,
-            credential=credential
-        )
-        
-        # Prepare documents for upload
-        documents = []
-        create_date = datetime.utcnow().isoformat() + "Z"
-        
-        for chunk in chunks:
-            document = {
-                "id": chunk.chunk_id,
-                "document_id": chunk.metadata.document_id,
-                "document_name": chunk.metadata.document_name,
-                "create_date": create_date,
-                "page_number": chunk.page_number,
-                "location": chunk.metadata.location,
-                "year": chunk.metadata.year,
-                "doc_type": chunk.metadata.doc_type,
-                "chunk_index": chunk.chunk_index,
-                "content": chunk.content,
-                "vector": chunk.embedding,
-                "group_id": group_access_list[0]
-            }
-            documents.append(document)
-        
-        # Upload documents in batches
-        batch_size = 100
-        for i in range(0, len(documents), batch_size):
-            batch = documents[i:i + batch_size]
-            result = search_client.upload_documents(documents=batch)
-            
-            # Check for errors
-            for item in result:
-                if not item.succeeded:
-                    logger.error(f"Failed to upload document {item.key}: {item.error_message}")
-            
-            logger.info(f"Uploaded batch {i // batch_size + 1}/{(len(documents) + batch_size - 1) // batch_size}")
-        
-        logger.info(f"Successfully uploaded {len(documents)} documents to search index")
+        async for chunks in chunk_batches:
+            documents = list(ChunkBatch.from_chunks(chunks).iter_as_search_docs(create_date, group_id))
+            total_chunks += len(documents)
+            # Wait for a free slot before reading further so downloads can't run ahead of uploads
+            await search_upload_slots.acquire()
+            # Stop downloading as soon as an upload has failed; later batches would fail the same way
+            for upload in uploads:
+                if upload.done() and not upload.cancelled() and upload.exception():
+                    search_upload_slots.release()
+                    raise upload.exception()
+            upload = asyncio.create_task(upload_batch(len(uploads) + 1, documents))
+            # Release on completion, including a cancellation before the upload started
+            upload.add_done_callback(lambda _: search_upload_slots.release())
+            uploads.append(upload)
+        
+        await asyncio.gather(*uploads)
+        logger.info(f"Successfully uploaded {total_chunks} documents to search index")
+        return total_chunks
         
+    except HTTPException:
+        for upload in uploads:
+            upload.cancel()
+        raise
     except Exception as e:
+        for upload in uploads:
+            upload.cancel()
+        invalidate_search_admin_key_on_auth_error(e)
         logger.error(f"Error uploading chunks to search index: {str(e)}")
         logger.error(f"Traceback: {traceback.format_exc()}")
         raise HTTPException(
             status_code=500,
             detail=f"Error uploading chunks to search index: {str(e)}"
         )
+    finally:
+        # Release the blob download if the upload stopped before the document was fully read
+        await chunk_batches.aclose()
+
+
+@app.on_event("startup")
+async def startup():
+    """Build the OpenAPI schema up front so the first docs request doesn't pay for it."""
+    # Validators and serializers are built when the models are defined; only the JSON
+    # schemas (including json_schema_extra examples) are generated lazily, and app.openapi()
+    # caches the result on the app
+    app.openapi()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Close pooled Blob Storage, Azure AI Search and Key Vault connections when the application stops."""
+    if blob_service_client:
+        await blob_service_client.close()
+    for search_client in search_clients.values():
+        await search_client.close()
+    if search_index_client:
+        search_index_client.close()
+    if secret_client:
+        secret_client.close()
+    await async_credential.close()
+    credential.close()
 
 
 @app.get("/")
@@ -359,15 +615,34 @@ async def health_check():
     }
 
 
+@app.post("/refresh/{document_id}")
+async def refresh_document(document_id: str):
+    """
+    Drop a document's cached chunks so the next request downloads them again.
+    
+    Args:
+        document_id: ID of the document whose chunk blobs changed
+        
+    Returns:
+        Whether cached chunks were dropped for the document
+    """
+    was_cached = chunk_cache.pop(document_id, None) is not None
+    logger.info(f"Refreshed document_id: {document_id} (cached: {was_cached})")
+    return {
+        "document_id": document_id,
+        "was_cached": was_cached
+    }
+
+
 @app.post("/upload", response_model=UploadDocumentResponse)
 async def upload_document(request: UploadDocumentRequest):
     """
     Download embedded chunks from Azure Blob Storage and upload to Azure AI Search.
     
     This endpoint:
-    1. Downloads all embedded chunk JSON files from Azure Blob Storage
-    2. Ensures the Azure AI Search index exists with correct schema
-    3. Uploads all chunks to the search index with group access control
+    1. Ensures the Azure AI Search index exists with correct schema
+    2. Streams embedded chunks from Azure Blob Storage in batches
+    3. Uploads each batch to the search index with group access control as it arrives
     
     Args:
         request: UploadDocumentRequest containing document_id
@@ -385,25 +660,31 @@ async def upload_document(request: UploadDocumentRequest):
             logger.error("Azure AI Search not configured")
             raise HTTPException(status_code=500, detail="Azure AI Search is not configured")
         
-        # 1) Download embedded chunks from blob storage
-        logger.info("Step 1: Downloading embedded chunks from blob storage")
-        chunks = download_embedded_chunks_from_blob_storage(request.document_id)
-        logger.info(f"Downloaded {len(chunks)} embedded chunks")
-        
-        # 2) Ensure search index exists
-        logger.info("Step 2: Ensuring search index exists")
+        # 1) Ensure search index exists
+        logger.info("Step 1: Ensuring search index exists")
         ensure_search_index_exists(request.index_name)
         
-        # 3) Upload chunks to search index
-        logger.info("Step 3: Uploading chunks to search index")
-        upload_chunks_to_search_index(chunks, search_config.group_access_list, request.index_name)
+        # 2) Stream embedded chunks from blob storage into the search index
+        logger.info("Step 2: Streaming embedded chunks from blob storage to search index")
+        total_chunks = await upload_chunks_to_search_index(
+            iter_embedded_chunk_batches(request.document_id),
+            search_config.group_access_list,
+            request.index_name
+        )
+        
+        if not total_chunks:
+            logger.warning(f"No embedded chunk files found for document_id: {request.document_id}")
+            raise HTTPException(
+                status_code=404,
+                detail=f"No embedded chunk files found for document_id '{request.document_id}'"
+            )
         
         logger.info(f"Successfully completed upload for document_id: {request.document_id}")
         
         return UploadDocumentResponse(
             document_id=request.document_id,
-            total_chunks=len(chunks),
-            message=f"Successfully uploaded {len(chunks)} chunks to search index '{request.index_name}'"
+            total_chunks=total_chunks,
+            index_name=request.index_name
         )
         
     except HTTPException:
@@ -421,4 +702,13 @@ if __name__ == "__main__":
     import os
     import uvicorn
     port = int(os.getenv("PORT", 8003))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    workers = int(os.getenv("WORKERS", "1"))
+    # Multiple worker processes need an import string so each worker can load the app
+    uvicorn.run(
+        "main:app" if workers > 1 else app,
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=workers
+    )
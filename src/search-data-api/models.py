@@ -1,9 +1,59 @@
 """
-Pydantic models for the Search Data API.
+Pydantic request/response models for the Search Data API, plus the msgspec structs that
+define and decode embedded chunks.
 """
 
-from typing import List, Optional
-from pydantic import BaseModel, Field
+import base64
+import sys
+from typing import Annotated, Any, Dict, Iterator, List, Union
+
+import msgspec
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field, computed_field
+
+from config import EMBEDDING_DIM
+
+
+# Embeddings are stored as float16 so blobs carry 2 bytes per dimension instead of a decimal string
+EMBEDDING_DTYPE = np.float16
+EMBEDDING_BYTES = EMBEDDING_DIM * np.dtype(EMBEDDING_DTYPE).itemsize
+
+# Longest metadata string worth interning; longer values are unlikely to repeat across chunks
+INTERN_MAX_LENGTH = 256
+
+# Document-level metadata fields whose values repeat on every chunk of a document
+INTERNED_METADATA_FIELDS = (
+    "producer",
+    "creator",
+    "creationdate",
+    "title",
+    "author",
+    "moddate",
+    "source",
+    "chunk_method",
+    "location",
+    "doc_type",
+    "document_id",
+    "document_name"
+)
+
+
+def decode_embedding(value: Any) -> np.ndarray:
+    """
+    Convert a stored embedding into a contiguous float32 array.
+    
+    Args:
+        value: A base64 string of float16 bytes (as written by the embedding API), raw
+            float16 bytes, a numpy array, or a legacy list of floats
+        
+    Returns:
+        Embedding as a 1-D float32 array
+    """
+    if isinstance(value, str):
+        value = base64.b64decode(value)
+    if isinstance(value, (bytes, bytearray)):
+        return np.frombuffer(value, dtype=EMBEDDING_DTYPE).astype(np.float32)
+    return np.asarray(value, dtype=np.float32)
 
 
 class UploadDocumentRequest(BaseModel):
@@ -12,13 +62,15 @@ class UploadDocumentRequest(BaseModel):
     document_id: str = Field(..., description="Unique identifier for the document")
     index_name: str = Field(..., description="Name of the Azure AI Search index to upload to")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "document_id": "9b7b3e33-07da-4fe5-9467-6de3074e26c9",
                 "index_name": "document-chunks"
             }
         }
+    )
 
 
 class UploadDocumentResponse(BaseModel):
@@ -26,70 +78,173 @@ class UploadDocumentResponse(BaseModel):
     
     document_id: str = Field(..., description="Document ID")
     total_chunks: int = Field(..., description="Total number of chunks uploaded")
-    message: str = Field(..., description="Status message")
+    index_name: str = Field(..., description="Name of the Azure AI Search index uploaded to")
     
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "document_id": "9b7b3e33-07da-4fe5-9467-6de3074e26c9",
                 "total_chunks": 50,
+                "index_name": "document-chunks",
                 "message": "Successfully uploaded 50 chunks to search index 'document-chunks'"
             }
         }
+    )
+    
+    @computed_field(description="Status message")
+    @property
+    def message(self) -> str:
+        """Status message, built from the other fields only when the response is serialized."""
+        return f"Successfully uploaded {self.total_chunks} chunks to search index '{self.index_name}'"
 
 
-class ChunkMetadata(BaseModel):
-    """Metadata for a document chunk."""
-    
-    producer: Optional[str] = None
-    creator: Optional[str] = None
-    creationdate: Optional[str] = None
-    title: Optional[str] = None
-    author: Optional[str] = None
-    moddate: Optional[str] = None
-    source: Optional[str] = None
-    total_pages: Optional[int] = None
-    page: Optional[int] = None
-    page_label: Optional[str] = None
-    chunk_method: Optional[str] = None
-    char_count: Optional[int] = None
-    location: Optional[str] = None
-    year: Optional[int] = None
-    doc_type: Optional[str] = None
-    document_id: Optional[str] = None
-    document_name: Optional[str] = None
-    chunk_size: Optional[int] = None
-    chunk_overlap: Optional[int] = None
-    chunk_index: Optional[int] = None
-    
-    class Config:
-        extra = "allow"  # Allow additional fields not explicitly defined
-
-
-class EmbeddedChunkData(BaseModel):
-    """Data model for an embedded document chunk."""
-    
-    chunk_id: str = Field(..., description="Unique identifier for the chunk")
-    chunk_index: int = Field(..., description="Index of the chunk within the document")
-    page_number: int = Field(..., description="Page number where this chunk appears")
-    content: str = Field(..., description="Text content of the chunk")
-    metadata: ChunkMetadata = Field(..., description="Metadata associated with the chunk")
-    embedding: List[float] = Field(..., description="Vector embedding of the chunk content")
-    
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "chunk_id": "9b7b3e33-07da-4fe5-9467-6de3074e26c9_0",
-                "chunk_index": 0,
-                "page_number": 1,
-                "content": "NEMT Solicitation Scope of Work Page 1 of 24 Contents...",
-                "metadata": {
-                    "producer": "macOS Version 26.1",
-                    "location": "Montana",
-                    "year": 2025,
-                    "doc_type": "request",
-                    "document_id": "9b7b3e33-07da-4fe5-9467-6de3074e26c9"
-                },
-                "embedding": [0.009, -0.031, 0.039]
+class ChunkMetadataStruct(msgspec.Struct, kw_only=True, frozen=True):
+    """Metadata for a document chunk, decoded straight from blob content."""
+    
+    producer: str | None = None
+    creator: str | None = None
+    creationdate: str | None = None
+    title: str | None = None
+    author: str | None = None
+    moddate: str | None = None
+    source: str | None = None
+    total_pages: int | None = None
+    page: int | None = None
+    page_label: str | None = None
+    chunk_method: str | None = None
+    char_count: int | None = None
+    location: str | None = None
+    year: int | None = None
+    doc_type: str | None = None
+    document_id: str | None = None
+    document_name: str | None = None
+    chunk_size: int | None = None
+    chunk_overlap: int | None = None
+    chunk_index: int | None = None
+
+
+def intern_chunk_metadata(chunks: List["EmbeddedChunkStruct"]):
+    """
+    Intern repeated document-level metadata strings in place.
+    
+    Only worth doing for chunks that are kept (e.g. cached); batches that are uploaded and
+    dropped would pay the cost for nothing.
+    
+    Args:
+        chunks: Decoded chunks whose metadata strings are replaced by interned copies
+    """
+    for chunk in chunks:
+        metadata = chunk.metadata
+        for name in INTERNED_METADATA_FIELDS:
+            value = getattr(metadata, name)
+            if value is not None and len(value) < INTERN_MAX_LENGTH:
+                # The struct is frozen; force_setattr swaps in the interned copy of an equal string
+                msgspec.structs.force_setattr(metadata, name, sys.intern(value))
+
+
+class EmbeddedChunkStruct(msgspec.Struct, frozen=True, array_like=False):
+    """
+    Embedded chunk decoded straight from blob content.
+    
+    The embedding is raw float16 bytes (decoded from its base64 JSON string), or a list
+    of floats for blobs written before float16 storage.
+    """
+    
+    chunk_id: str
+    chunk_index: int
+    page_number: int
+    content: str
+    metadata: ChunkMetadataStruct
+    embedding: Union[
+        Annotated[bytes, msgspec.Meta(min_length=EMBEDDING_BYTES, max_length=EMBEDDING_BYTES)],
+        Annotated[List[float], msgspec.Meta(min_length=EMBEDDING_DIM, max_length=EMBEDDING_DIM)]
+    ]
+
+
+# The decoder is built once; it is strict, so values are never coerced (e.g. "2025" is
+# rejected for year)
+chunk_list_json_decoder = msgspec.json.Decoder(List[EmbeddedChunkStruct])
+
+
+class ChunkBatch(BaseModel):
+    """
+    Column-oriented batch of embedded chunks.
+    
+    Embeddings are held in one contiguous (N, EMBEDDING_DIM) float32 array instead of a
+    separate object per chunk, so they can be normalized, compared or converted in a
+    single vectorized call.
+    """
+    
+    embeddings: np.ndarray = Field(..., description="Embeddings as a contiguous (N, D) float32 array")
+    chunk_ids: List[str] = Field(..., description="Chunk IDs")
+    chunk_indices: np.ndarray = Field(..., description="Chunk indexes as an int32 array")
+    page_numbers: np.ndarray = Field(..., description="Page numbers as an int32 array")
+    contents: List[str] = Field(..., description="Chunk text content")
+    metadatas: List[ChunkMetadataStruct] = Field(..., description="Chunk metadata")
+    
+    model_config = ConfigDict(frozen=True, arbitrary_types_allowed=True)
+    
+    @classmethod
+    def from_chunks(cls, chunks: List[EmbeddedChunkStruct]) -> "ChunkBatch":
+        """
+        Pack decoded chunks into a batch.
+        
+        Args:
+            chunks: Embedded chunks decoded from blob storage
+            
+        Returns:
+            ChunkBatch holding the chunks' columns
+        """
+        embeddings = [chunk.embedding for chunk in chunks]
+        if not embeddings:
+            matrix = np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+        elif all(isinstance(embedding, bytes) for embedding in embeddings):
+            # float16 blobs share one length, so join them and convert in a single pass
+            matrix = np.frombuffer(b"".join(embeddings), dtype=EMBEDDING_DTYPE)
+            matrix = matrix.reshape(len(embeddings), -1).astype(np.float32)
+        else:
+            matrix = np.stack([decode_embedding(embedding) for embedding in embeddings])
+        
+        return cls(
+            embeddings=matrix,
+            chunk_ids=[chunk.chunk_id for chunk in chunks],
+            chunk_indices=np.fromiter((chunk.chunk_index for chunk in chunks), dtype=np.int32, count=len(chunks)),
+            page_numbers=np.fromiter((chunk.page_number for chunk in chunks), dtype=np.int32, count=len(chunks)),
+            contents=[chunk.content for chunk in chunks],
+            metadatas=[chunk.metadata for chunk in chunks]
+        )
+    
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+    
+    def iter_as_search_docs(self, create_date: str, group_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the Azure AI Search document for each chunk in the batch.
+        
+        Args:
+            create_date: Upload timestamp shared by all documents in the batch
+            group_id: Group ID for access control
+            
+        Yields:
+            Search documents as plain dicts
+        """
+        # One tolist() per column converts to Python values in C instead of per element
+        vectors = self.embeddings.tolist()
+        chunk_indices = self.chunk_indices.tolist()
+        page_numbers = self.page_numbers.tolist()
+        for i, metadata in enumerate(self.metadatas):
+            yield {
+                "id": self.chunk_ids[i],
+                "document_id": metadata.document_id,
+                "document_name": metadata.document_name,
+                "create_date": create_date,
+                "page_number": page_numbers[i],
+                "location": metadata.location,
+                "year": metadata.year,
+                "doc_type": metadata.doc_type,
+                "chunk_index": chunk_indices[i],
+                "content": self.contents[i],
+                "vector": vectors[i],
+                "group_id": group_id
             }
-        }